@@ -9,27 +9,44 @@ correct format.
 """
 
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
 import logging
 import csv
 import re
 import os
+import tempfile
+import threading
 import time
-from webdav3.client import Client
-from webdav3.exceptions import WebDavException
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed
+)
+from webdav3.client import Client, WebDavXmlUtils, wrap_connection_error
+from webdav3.exceptions import (
+    MethodNotSupported,
+    RemoteResourceNotFound,
+    WebDavException
+)
+from webdav3.urn import Urn
+
+
+def configure_logging() -> None:
+    """
+    Configure logging for the main process and the worker processes.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+configure_logging()
 logger = logging.getLogger('dkb2ynab')
 
-# date and time
-today = datetime.now()
-datestamp = today.strftime('%Y%m%d')
-
 # collect environment variables
 webdav_host = os.environ.get('WEBDAV_HOST')
 webdav_user = os.environ.get('WEBDAV_USER')
@@ -46,166 +63,286 @@ webdav_options = {
     'webdav_password': webdav_password
 }
 
+# WebDAV clients are reused per thread, so the HTTP session of a client
+# and its connections are kept alive between requests of that thread.
+# The main thread keeps its client across polls, while the download
+# threads only exist for a single poll and reuse theirs within it.
+webdav_local = threading.local()
+
+# ETags of the WebDAV directories as seen after the last complete
+# download run, together with the number of polls skipped since then.
+# They are used to skip listing directories that did not change.
+webdav_etags = {}
+# Servers are not required to change the ETag of a directory when its
+# contents change, so the directory is listed again after this many
+# skipped polls regardless of its ETag
+_ETAG_MAX_SKIPS = 5
+
+# Valid German IBAN
+_IBAN_RE = re.compile(r'^DE\d{20}$')
+# File name that only contains a date range in the format of
+# 'YYYYMMDD-YYYYMMDD.csv'
+_FNAME_RE = re.compile(r'(?P<start>\d{8})-(?P<end>\d{8})\.csv')
+
+# Translation table to convert amounts from 'X.XXX,XX' to 'XXXX.XX'
+_AMOUNT_TABLE = str.maketrans({'.': '', ',': '.'})
+
 
 def convert_data(file, start_date=None, end_date=None) -> None:
     """
     Do the actual csv data conversation from the DKB to the YNAB format.
     """
 
-    with open(file, 'r', encoding='utf-8-sig') as dkb_csv:
-        # Field names for the DKB csv import file
-        dkb_csv_fieldnames = [
-            'Buchungsdatum',
-            'Wertstellung',
-            'Status',
-            'Zahlungspflichtige*r',
-            'Zahlungsempfänger*in',
-            'Verwendungszweck',
-            'Umsatztyp',
-            'IBAN',
-            'Betrag (€)',
-            'Gläubiger-ID',
-            'Mandatsreferenz',
-            'Kundenreferenz'
-        ]
-        logger.debug('DKB CSV fieldnames: %s', dkb_csv_fieldnames)
-        # Field names for the YNAB csv export file
-        ynab_csv_fieldnames = [
-            'Date',
-            'Payee',
-            'Memo',
-            'Amount',
-        ]
-        logger.debug('YNAB CSV fieldnames: %s', ynab_csv_fieldnames)
-
-        # Read the DKB CSV file
-        dkb_reader = csv.DictReader(
-            dkb_csv,
-            fieldnames=dkb_csv_fieldnames,
-            delimiter=';',
-            quotechar='"'
+    # Read all lines of the DKB CSV file at once, so the file is
+    # closed again before the conversion starts
+    with open(file, 'r', encoding='utf-8-sig') as dkb_file:
+        dkb_lines = dkb_file.readlines()
+    dkb_csv = iter(dkb_lines)
+
+    # Field names for the DKB csv import file
+    dkb_csv_fieldnames = [
+        'Buchungsdatum',
+        'Wertstellung',
+        'Status',
+        'Zahlungspflichtige*r',
+        'Zahlungsempfänger*in',
+        'Verwendungszweck',
+        'Umsatztyp',
+        'IBAN',
+        'Betrag (€)',
+        'Gläubiger-ID',
+        'Mandatsreferenz',
+        'Kundenreferenz'
+    ]
+    logger.debug('DKB CSV fieldnames: %s', dkb_csv_fieldnames)
+    # Field names for the YNAB csv export file
+    ynab_csv_fieldnames = [
+        'Date',
+        'Payee',
+        'Memo',
+        'Amount',
+    ]
+    logger.debug('YNAB CSV fieldnames: %s', ynab_csv_fieldnames)
+
+    # Positions of the DKB columns we need. Rows are read as plain
+    # lists, which avoids building a dictionary for every row.
+    date_idx = dkb_csv_fieldnames.index('Buchungsdatum')
+    payer_idx = dkb_csv_fieldnames.index('Zahlungspflichtige*r')
+    payee_idx = dkb_csv_fieldnames.index('Zahlungsempfänger*in')
+    memo_idx = dkb_csv_fieldnames.index('Verwendungszweck')
+    type_idx = dkb_csv_fieldnames.index('Umsatztyp')
+    amount_idx = dkb_csv_fieldnames.index('Betrag (€)')
+
+    # Read the header lines of the DKB CSV file
+    dkb_reader = csv.reader(
+        dkb_csv,
+        delimiter=';',
+        quotechar='"'
+    )
+    # Check the first line of the CSV file and use the first
+    # column as account name and the second column as IBAN.
+    header = next(dkb_reader, None)
+    if header is None:
+        logger.error('Empty DKB CSV file: %s', file)
+        raise ValueError(f'Empty DKB CSV file: {file}')
+    account_name = header[0]
+    iban = header[1]
+    logger.info('Account name: %s', account_name)
+    logger.info('IBAN: %s', iban)
+
+    # Check if 'iban' matches a real valid IBAN using a
+    # regular expression
+    if not _IBAN_RE.match(iban):
+        logger.error('Invalid IBAN: %s', iban)
+        raise ValueError(f'Invalid IBAN: {iban}')
+
+    # Real data begins after the first 5 lines, so we skip the
+    # remaining header lines before iterating through the rows.
+    for _ in range(4):
+        next(dkb_reader, None)
+
+    # The date is taken for every conversion, as the script keeps
+    # running across multiple days
+    datestamp = datetime.now().strftime('%Y%m%d')
+    if start_date and end_date:
+        ynab_file_name = (
+            f'{datestamp}-{account_name}-'
+            f'{iban}_{start_date}_{end_date}.csv'
         )
-        # Let us iterate through the rows in the DKB CSV file
-        for row in dkb_reader:
-            logger.debug('Line number: %s', dkb_reader.line_num)
+    else:
+        ynab_file_name = f'{datestamp}-{account_name}-{iban}.csv'
+
+    # Converted rows are collected and written in one go after
+    # the DKB CSV file has been processed.
+    output_rows = []
+    # Many transactions share the same booking date, so we only
+    # parse and format every distinct date once.
+    date_cache: dict[str, tuple[datetime, str]] = {}
+    # If we have a start and end date, we only add lines for the
+    # desired date range.
+    filter_dates = bool(start_date and end_date)
+
+    # DKB quotes every field. As long as no field contains a quote
+    # itself, the only quotes are the ones at the start and the end
+    # of the line and the ones around the separators, and the line
+    # can be split without the csv module.
+    field_count = len(dkb_csv_fieldnames)
+    quote_count = 2 * field_count
+
+    # Bind everything used for every row to local names, which are
+    # faster to look up in the loop than attributes and globals.
+    add_row = output_rows.append
+    get_cached_date = date_cache.get
+    amount_table = _AMOUNT_TABLE
+    log_rows = logger.isEnabledFor(logging.DEBUG)
+
+    # Let us iterate through the rows in the DKB CSV file
+    for line in dkb_csv:
+        stripped_line = line.rstrip('\r\n')
+        row = stripped_line[1:-1].split('";"')
+        if (
+            len(row) != field_count or
+            stripped_line.count('"') != quote_count or
+            stripped_line[:1] != '"' or stripped_line[-1:] != '"'
+           ):
+            # Fall back to the csv module for all other lines, e.g.
+            # with quotes within a field or empty lines. The reader
+            # continues on the file if a quoted field spans
+            # multiple lines.
+            row = next(csv.reader(
+                chain([line], dkb_csv),
+                delimiter=';',
+                quotechar='"'
+            ), [])
+        if log_rows:
             logger.debug('Row: %s', row)
-            # Check the first line of the CSV file and use the first
-            # column as account name and the second column as IBAN.
-            if dkb_reader.line_num == 1:
-                account_name = row['Buchungsdatum']
-                iban = row['Wertstellung']
-                logger.info('Account name: %s', account_name)
-                logger.info('IBAN: %s', iban)
-
-                # Check if 'iban' matches a real valid IBAN using a
-                # regular expression
-                if not re.match(r'^DE\d{20}$', iban):
-                    logger.error('Invalid IBAN: %s', iban)
-                    raise ValueError(f'Invalid IBAN: {iban}')
-
-                if start_date and end_date:
-                    ynab_file_name = (
-                        f'{workdir}/'
-                        f'{datestamp}-{account_name}-'
-                        f'{iban}_{start_date}_{end_date}.csv'
-                    )
-                else:
-                    ynab_file_name = (
-                        f'{workdir}/'
-                        f'{datestamp}-{account_name}-{iban}.csv'
-                    )
-                logger.info('Writing local YNAB CSV file: %s', ynab_file_name)
-                with open(
-                    ynab_file_name, 'w', encoding='utf-8-sig'
-                ) as ynab_file:
-                    writer = csv.DictWriter(
-                        ynab_file,
-                        fieldnames=ynab_csv_fieldnames
-                    )
-                    writer.writeheader()
-
-            # Real data begins after the first 5 lines.
-            if dkb_reader.line_num > 5:
-                # Convert the date format from 'DD.MM.YYYY'
-                # to 'YYYY-MM-DD'
-                date = datetime.strptime(
-                    row['Buchungsdatum'], '%d.%m.%y'
-                )
-                date_str = date.strftime('%Y-%m-%d')
-
-                # If we have a start and end date, we only add lines
-                # for the desired date range.
-                if start_date and end_date:
-                    # Skip the row if the date is outside the
-                    # specified range
-                    if date < start_date or date > end_date:
-                        continue
-
-                # Convert the amount format from 'X.XXX,XX' to 'X.XX'
-                amount = row['Betrag (€)'].replace(
-                    '.', '').replace(',', '.')
-
-                # Write the row to the YNAB CSV file
-                ynab_row = {
-                    'Date': date_str,
-                    'Memo': row['Verwendungszweck'],
-                    'Amount': amount
-                }
-
-                # If we have an inflow of money, we need to switch
-                # payee and payer information
-                if row['Umsatztyp'] == 'Eingang':
-                    ynab_row['Payee'] = row['Zahlungspflichtige*r']
-                else:
-                    ynab_row['Payee'] = row['Zahlungsempfänger*in']
-
-                # Skip the last line if it is the DKB summary that
-                # provides information about the interested rates and
-                # the total balance from before the first transaction
-                if (
-                    row['Zahlungspflichtige*r'] == 'DKB AG' and
-                    'Kontostand/Rechnungsabschluss' in
-                    row['Verwendungszweck']
-                   ):
-                    continue
-
-                with open(
-                    ynab_file_name, 'a', encoding='utf-8-sig'
-                ) as ynab_file:
-                    ynab_writer = csv.DictWriter(
-                        ynab_file,
-                        fieldnames=ynab_csv_fieldnames,
-                        delimiter=','
-                    )
-                    ynab_writer.writerow(ynab_row)
-                    logger.debug(
-                        'Row written to local YNAB CSV file: %s',
-                        ynab_row
-                    )
-
-        try:
-            # Upload the converted file to the webdav server
-            upload_webdav_file(
-                webdav_options,
-                ynab_file_name,
-                ynab_folder
+        # Skip empty lines
+        if not row:
+            continue
+
+        # Skip the last line if it is the DKB summary that
+        # provides information about the interested rates and
+        # the total balance from before the first transaction
+        if (
+            row[payer_idx] == 'DKB AG' and
+            'Kontostand/Rechnungsabschluss' in
+            row[memo_idx]
+           ):
+            continue
+
+        # Convert the date format from 'DD.MM.YY'
+        # to 'YYYY-MM-DD'. The format is fixed, so we slice
+        # the string instead of using strptime. Creating the
+        # datetime object also rejects invalid days and months.
+        raw_date = row[date_idx]
+        cached_date = get_cached_date(raw_date)
+        if cached_date is None:
+            day = raw_date[0:2]
+            month = raw_date[3:5]
+            year = raw_date[6:8]
+            digits = day + month + year
+            if (
+                len(raw_date) != 8 or
+                raw_date[2] != '.' or raw_date[5] != '.' or
+                not digits.isascii() or not digits.isdigit()
+               ):
+                logger.error('Invalid booking date: %s', raw_date)
+                raise ValueError(f'Invalid booking date: {raw_date}')
+            parsed_date = datetime(int('20' + year), int(month), int(day))
+            cached_date = (parsed_date, f'20{year}-{month}-{day}')
+            date_cache[raw_date] = cached_date
+        date, date_str = cached_date
+
+        # Skip the row if the date is outside the specified range
+        # before doing any further work on it. The export is not
+        # guaranteed to be strictly sorted (e.g. pending bookings), so
+        # we never stop reading early.
+        if filter_dates and (date < start_date or date > end_date):
+            continue
+
+        # Convert the amount format from 'X.XXX,XX' to 'X.XX'
+        amount = row[amount_idx].translate(amount_table)
+
+        # Row for the YNAB CSV file, in the order of the YNAB
+        # field names. If we have an inflow of money, we need to
+        # switch payee and payer information.
+        ynab_row = (
+            date_str,
+            row[payer_idx] if row[type_idx] == 'Eingang'
+            else row[payee_idx],
+            row[memo_idx],
+            amount
+        )
+        add_row(ynab_row)
+        if log_rows:
+            logger.debug(
+                'Row added to local YNAB CSV file: %s',
+                ynab_row
             )
-        except Exception as e:
-            logger.error("Failed to upload file %s (%s)",
-                         ynab_file_name, e)
 
-        try:
-            # Delete the converted file after uploading
-            Path(ynab_file_name).unlink()
-            logger.info("Deleted local YNAB CSV file: %s", ynab_file_name)
-        except Exception as e:
-            logger.error("Failed to delete file %s (%s)",
-                         ynab_file_name, e)
+    # Files are converted in parallel and several of them can result
+    # in the same YNAB file name, so every conversion writes its own
+    # local file. The file is uploaded under the YNAB file name.
+    local_fd, local_file_name = tempfile.mkstemp(
+        prefix=f'{Path(file).stem}-', suffix='.ynab', dir=workdir
+    )
+    logger.info('Writing local YNAB CSV file %s: %s',
+                ynab_file_name, local_file_name)
+    # Open the YNAB CSV file only once and write the header and
+    # all converted rows through the same file handle.
+    with open(
+        local_fd, 'w', encoding='utf-8-sig', buffering=1 << 20
+    ) as ynab_file:
+        ynab_writer = csv.writer(
+            ynab_file,
+            delimiter=','
+        )
+        ynab_writer.writerow(ynab_csv_fieldnames)
+        ynab_writer.writerows(output_rows)
+        # Make sure the file is completely on disk before uploading
+        ynab_file.flush()
+        os.fsync(ynab_file.fileno())
+        logger.debug('%s rows written to local YNAB CSV file',
+                     len(output_rows))
+
+    try:
+        # Upload the converted file to the webdav server
+        upload_webdav_file(
+            webdav_options,
+            local_file_name,
+            ynab_folder,
+            ynab_file_name
+        )
+    except Exception as e:
+        logger.error("Failed to upload file %s (%s)",
+                     local_file_name, e)
+
+    try:
+        # Delete the converted file after uploading
+        Path(local_file_name).unlink()
+        logger.info("Deleted local YNAB CSV file: %s", local_file_name)
+    except Exception as e:
+        logger.error("Failed to delete file %s (%s)",
+                     local_file_name, e)
+
+
+def get_webdav_client(options):
+    """
+    Return the WebDAV client of the current thread. The client is
+    created on first use and reused afterwards, as long as it is
+    requested with the same options.
+    """
+    client = getattr(webdav_local, 'client', None)
+    if client is None or webdav_local.options != options:
+        client = Client(options)
+        webdav_local.client = client
+        webdav_local.options = dict(options)
+    return client
 
 
 def delete_webdav_file(options, remote_file):
     """Delete remote file from WebDAV."""
-    client = Client(options)
+    client = get_webdav_client(options)
     try:
         client.clean(remote_file)
         logging.info("Successfully deleted file '%s' from WebDAV",
@@ -216,19 +353,79 @@ def delete_webdav_file(options, remote_file):
                       remote_file, exception)
 
 
+def download_webdav_file(options, remote_dir, local_dir, webdav_file):
+    """
+    Download a single file from WebDAV and delete it on the server
+    afterwards. Clients are not shared between threads, so this
+    function can be used from multiple threads. Returns True if the
+    download was successful.
+    """
+    client = get_webdav_client(options)
+    remote_filename = f"{remote_dir}/{webdav_file}"
+    local_filename = f"{local_dir}/{webdav_file}"
+    try:
+        client.download_sync(remote_filename, local_filename)
+        logging.info("Successfully downloaded file '%s'"
+                     " from WebDAV directory '%s'",
+                     webdav_file, remote_dir)
+        # Disabled for debugging purposes
+        delete_webdav_file(options, remote_filename)
+    except WebDavException as exception:
+        logging.error("Could not download file '%s'"
+                      " from WebDAV directory '%s': %s",
+                      webdav_file, remote_dir, exception)
+        return False
+    return True
+
+
+@wrap_connection_error
+def get_webdav_etag(client, remote_dir):
+    """
+    Return the ETag of a WebDAV directory. Only the directory itself is
+    requested (PROPFIND with 'Depth: 0'), not its contents. Connection
+    errors are raised as WebDAV exceptions, like for the client's own
+    methods. Returns None if the response cannot be parsed.
+    """
+    urn = Urn(remote_dir, directory=True)
+    response = client.execute_request(
+        action='info',
+        path=urn.quote(),
+        headers_ext=['Depth: 0']
+    )
+    try:
+        info = WebDavXmlUtils.parse_info_response(
+            content=response.content,
+            path=client.get_full_path(urn),
+            hostname=client.webdav.hostname
+        )
+    except (MethodNotSupported, RemoteResourceNotFound) as exception:
+        logging.debug("Could not read ETag of WebDAV directory '%s':"
+                      " %s", remote_dir, exception)
+        return None
+    return info.get('etag')
+
+
 def download_webdav_files(options, remote_dir, local_dir):
     """
     This code defines a function to download files from a WebDAV
     server to a local directory. It connects to the WebDAV server,
     lists files in the specified directory, filters out hidden
     files, and then downloads each non-hidden file to the local
-    directory. If the WebDAV directory does not exist, it logs an
-    error message.
+    directory. If the WebDAV directory has not changed since the last
+    complete run, according to its ETag, nothing is listed or
+    downloaded for up to _ETAG_MAX_SKIPS polls. If the WebDAV
+    directory does not exist, it logs an error message.
     """
     # Connect to WebDAV
-    client = Client(options)
+    client = get_webdav_client(options)
     try:
-        client.check(remote_dir)
+        etag = get_webdav_etag(client, remote_dir)
+        known_etag, skipped = webdav_etags.get(remote_dir, (None, 0))
+        if etag and etag == known_etag and skipped < _ETAG_MAX_SKIPS:
+            webdav_etags[remote_dir] = (etag, skipped + 1)
+            logging.info("WebDAV directory '%s' has not changed"
+                         " since the last run", remote_dir)
+            return
         logging.info("WebDAV directory '%s' exists."
                      " Retrieving contents...", remote_dir)
         # List files in the directory
@@ -239,45 +436,59 @@ def download_webdav_files(options, remote_dir, local_dir):
         # We also do not want hidden files, so we remove them
         # as well from the output
         safe_files = [f for f in webdav_files if not f.startswith('.')]
+        # Only remember the ETag if all files have been downloaded, so
+        # failed downloads are retried during the next run.
+        complete = True
         if safe_files:
-            # Process each file
-            for webdav_file in safe_files:
-                remote_filename = f"{remote_dir}/{webdav_file}"
-                local_filename = f"{local_dir}/{webdav_file}"
-                try:
-                    client.download_sync(remote_filename, local_filename)
-                    logging.info("Successfully downloaded file '%s'"
-                                 " from WebDAV directory '%s'",
-                                 webdav_file, remote_dir)
-                    # Disabled for debugging purposes
-                    delete_webdav_file(options, remote_filename)
-                except WebDavException as exception:
-                    logging.error("Could not download file '%s'"
-                                  " from WebDAV directory '%s': %s",
-                                  webdav_file, remote_dir, exception)
+            # Process the files concurrently, as every download is
+            # mostly waiting for the WebDAV server
+            with ThreadPoolExecutor(
+                max_workers=min(len(safe_files), 8)
+            ) as executor:
+                futures = [
+                    executor.submit(download_webdav_file, options,
+                                    remote_dir, local_dir, webdav_file)
+                    for webdav_file in safe_files
+                ]
+                for future in as_completed(futures):
+                    if not future.result():
+                        complete = False
         else:
             logging.info("No new files found in WebDAV directory '%s'",
                          remote_dir)
+        if complete:
+            # Downloaded files are deleted on the server, which changes
+            # the ETag of the directory, so we take it again.
+            if safe_files:
+                etag = get_webdav_etag(client, remote_dir)
+            if etag:
+                webdav_etags[remote_dir] = (etag, 0)
+        else:
+            webdav_etags.pop(remote_dir, None)
     except WebDavException as e:
         logging.error("WebDAV directory '%s' does not exist: %s",
                       remote_dir, e)
 
 
-def upload_webdav_file(options, local_file, remote_dir):
+def upload_webdav_file(options, local_file, remote_dir,
+                       remote_filename=None):
     """
-    Upload the converted CSV file to the WebDAV server.
+    Upload the converted CSV file to the WebDAV server. The remote
+    file name defaults to the name of the local file.
     """
-    remote_filename = Path(local_file).name
+    if remote_filename is None:
+        remote_filename = Path(local_file).name
     remote_filepath = f"{remote_dir}/{remote_filename}"
-    client = Client(options)
+    client = get_webdav_client(options)
     try:
-        client.check(remote_dir)
-        client.upload_sync(
+        # upload_file() checks the remote directory itself and streams
+        # the content of the opened local file to the server
+        client.upload_file(
             remote_path=remote_filepath,
             local_path=local_file
         )
         logging.info("Successfully uploaded file '%s' to WebDAV"
-                     " directory '%s'", local_file, remote_dir)
+                     " as '%s'", local_file, remote_filepath)
     except WebDavException as exception:
         logging.error("Could not upload file '%s' to WebDAV"
                       " directory '%s': %s", local_file, remote_dir,
@@ -288,19 +499,21 @@ def convert_file(file):
     """
     Convert DKB CSV bank account export to YNAB coompatible CSV format.
     """
-
-    # Define pattern of filename that only contains date range in the
-    # format of 'YYYYMMDD-YYYYMMDD.csv'
-    pattern = r'\d{8}-\d{8}\.csv'
+    logger.info('Converting file: %s', file)
 
     # If the pattern matches, we need to extract the date rangtes and
     # treat the file differently. Only converting the transactions
     # within the date range
-    if re.match(pattern, file.name):
-        start_date_str = file.name.split('-')[0]
-        end_date_str = file.name.split('-')[1].split('.')[0]
-        start_date = datetime.strptime(start_date_str, '%Y%m%d')
-        end_date = datetime.strptime(end_date_str, '%Y%m%d')
+    match = _FNAME_RE.match(file.name)
+    if match:
+        start_date_str = match['start']
+        end_date_str = match['end']
+        start_date = datetime(int(start_date_str[0:4]),
+                              int(start_date_str[4:6]),
+                              int(start_date_str[6:8]))
+        end_date = datetime(int(end_date_str[0:4]),
+                            int(end_date_str[4:6]),
+                            int(end_date_str[6:8]))
         try:
             convert_data(file, start_date, end_date)
         except Exception as e:
@@ -322,6 +535,16 @@ def convert_file(file):
         Path(file).unlink()
 
 
+def init_worker() -> None:
+    """
+    Initialize a worker process used for converting files.
+    """
+    configure_logging()
+    # Do not share the HTTP connections of the parent process, the
+    # worker creates its own WebDAV client when it needs one.
+    webdav_local.client = None
+
+
 def main() -> None:
     """
     Main function to process files and sleep for the configured
@@ -348,15 +571,26 @@ def main() -> None:
         # Download files from webdav into local work directory
         download_webdav_files(webdav_options, csv_folder, workdir)
 
-        files = Path(workdir).glob('*.csv')
+        # Collect the CSV files in the work directory. DirEntry.is_file()
+        # uses the file type from the directory listing and does not
+        # need an additional stat call per file.
+        with os.scandir(workdir) as entries:
+            files = [
+                Path(entry.path) for entry in entries
+                if entry.is_file() and entry.name.endswith('.csv')
+            ]
         if not files:
             logger.info(
-                'No new files found in source directory: %s', csv_folder
+                'No new files found in work directory: %s', workdir
             )
         else:
-            for file in files:
-                logger.info('Converting file: %s', file)
-                convert_file(file)
+            # Every file is converted independently, so we convert
+            # them in parallel worker processes.
+            with ProcessPoolExecutor(
+                max_workers=min(len(files), os.cpu_count() or 1),
+                initializer=init_worker
+            ) as executor:
+                list(executor.map(convert_file, files))
 
         logger.info('Sleeping for %s seconds', interval)
         time.sleep(int(interval))